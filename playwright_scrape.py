@@ -6,22 +6,34 @@
 #   and any optional 'home_ports' links from ships.json; checks both Arrivals/Departures tabs)
 #
 # Requirements:
-#   pip install playwright beautifulsoup4
+#   pip install playwright beautifulsoup4 requests
+#   (optional) pip install orjson lxml   # faster history/state JSON and HTML parsing
 #   python -m playwright install --with-deps chromium
 
-import os, json, hashlib, sys, math, traceback, re, time, random
+import os, json, hashlib, sys, math, traceback, re, random, asyncio, heapq
 from datetime import datetime, timezone, timedelta
 try:
     from zoneinfo import ZoneInfo
 except Exception:
     ZoneInfo = None
 from urllib.parse import urljoin, urlparse, urlunparse, parse_qs, urlencode
-from playwright.sync_api import sync_playwright, TimeoutError as PWTimeout
+from playwright.async_api import async_playwright, TimeoutError as PWTimeout
 from bs4 import BeautifulSoup, Tag, NavigableString
-import urllib.request
+import requests
 import smtplib, ssl
 from email.message import EmailMessage
 from functools import lru_cache
+from operator import itemgetter
+from itertools import islice
+try:
+    import lxml  # noqa: F401  (optional: faster BeautifulSoup tree builder)
+    _HTML_PARSER = "lxml"
+except ImportError:
+    _HTML_PARSER = "html.parser"
+try:
+    import orjson   # optional: C-backed JSON, same bytes as json.dumps(indent=2, ensure_ascii=False)
+except ImportError:
+    orjson = None
 
 REPO_ROOT  = os.path.dirname(__file__)
 DOCS_DIR   = os.path.join(REPO_ROOT, "docs")
@@ -32,6 +44,16 @@ SHIPS_PATH = os.path.join(REPO_ROOT, "ships.json")
 HIST_DIR      = os.path.join(REPO_ROOT, "history")
 PER_SHIP_CAP  = 250
 ALL_CAP       = 500
+SEEN_CAP      = 10_000   # newest guids kept in state.json's canon_seen (oldest dropped first)
+
+# ---- Concurrency (ships scraped in parallel on one shared browser)
+SHIP_CONCURRENCY = max(1, int(os.getenv("SHIP_CONCURRENCY", "4") or "4"))
+PAGE_POOL_SIZE   = max(1, int(os.getenv("PAGE_POOL_SIZE", "6") or "6"))   # warm pages per context, shared by all ship tasks
+
+# ---- Port-page fallback gating
+# Skip the fallback when this run already found a new ship-page event this recent.
+PORT_FALLBACK_STALE_HOURS = float(os.getenv("PORT_FALLBACK_STALE_HOURS", "18") or "18")
+FORCE_PORT_FALLBACK       = os.getenv("FORCE_PORT_FALLBACK", "0") == "1"
 
 # ---- Special geofences (center lat/lon + radius_km)
 SPECIAL_GEOFENCES = {
@@ -52,9 +74,19 @@ SPECIAL_GEOFENCES = {
         "radius_km": 6.0
     }
 }
+def _fence_row(name, info):
+    lat, lon = math.radians(info["center"][0]), math.radians(info["center"][1])
+    ang = info["radius_km"] / 6371.0   # fence radius as a central angle
+    # Half-widths (radians) of a box that fully contains the fence circle; 1% slack for rounding
+    lat_span = ang * 1.01
+    lon_span = math.asin(min(1.0, math.sin(ang) / math.cos(lat))) * 1.01
+    return (name, lat, lon, math.cos(lat), info["radius_km"], lat_span, lon_span)
+
+# Flattened (name, lat_rad, lon_rad, cos_lat, radius_km, lat_span, lon_span) rows for the geofence sweep
+_FENCES = tuple(_fence_row(name, info) for name, info in SPECIAL_GEOFENCES.items())
 
 # ---- Port timezone mapping (substring match, case-insensitive) - fallback
-PORT_TZ_MAP = [
+PORT_TZ_MAP = (
     ("canaveral", "America/New_York"),
     ("everglades", "America/New_York"),
     ("fort lauderdale", "America/New_York"),
@@ -145,7 +177,7 @@ PORT_TZ_MAP = [
     ("funchal", "Atlantic/Madeira"),
     ("vancouver", "America/Vancouver"),
     ("victoria", "America/Vancouver"),
-]
+)
 
 # ---- VF port link country prefix → IANA tz (primary)
 TZ_BY_PORT_PREFIX = {
@@ -212,13 +244,14 @@ GLOBAL_FALLBACK_PORTS = [
 
 # ---------- Utilities ----------
 
-def _sleep_jitter(min_s=0.6, max_s=1.2):
-    time.sleep(random.uniform(min_s, max_s))
+async def _sleep_jitter(min_s=0.6, max_s=1.2):
+    await asyncio.sleep(random.uniform(min_s, max_s))
+
+_BLOCK_RE = re.compile(r"captcha|access denied|cf-[^<>]{0,200}turnstile", re.IGNORECASE)
 
 def _looks_blocked(html: str) -> bool:
     if not html: return True
-    low = html.lower()
-    return ("captcha" in low) or ("access denied" in low) or (("cf-" in low) and ("turnstile" in low))
+    return bool(_BLOCK_RE.search(html))
 
 @lru_cache(maxsize=256)
 def zinfo(tz_name: str):
@@ -230,84 +263,143 @@ def zinfo(tz_name: str):
         pass
     return ZoneInfo("America/New_York") if ZoneInfo else None
 
-def zinfo_eastern():
-    return zinfo("America/New_York")
+_EASTERN = zinfo("America/New_York")
+
+def _json_loads(path: str):
+    if orjson:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _json_dumps(data, compact: bool = False) -> str:
+    if orjson:
+        return orjson.dumps(data, option=0 if compact else orjson.OPT_INDENT_2).decode("utf-8")
+    if compact:
+        return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+    return json.dumps(data, indent=2, ensure_ascii=False)
 
 def load_json(path, default):
     try:
         if os.path.exists(path):
-            with open(path, "r", encoding="utf-8") as f:
-                return json.load(f)
+            return _json_loads(path)
     except Exception as e:
         print(f"[warn] Failed to load {path}: {e}", file=sys.stderr)
     return default
 
-def save_json(path, data):
+def save_json(path, data, compact: bool = False):
     try:
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        _write_if_changed(path, _json_dumps(data, compact))
     except Exception as e:
         print(f"[error] Failed to save {path}: {e}", file=sys.stderr)
 
+@lru_cache(maxsize=None)
+def _ensure_dir(path: str) -> None:
+    # One makedirs per directory per run; a failed call raises and is not cached
+    os.makedirs(path, exist_ok=True)
+
 def _write_if_changed(path: str, text: str) -> bool:
-    """Write only if content changed. Returns True if written."""
+    """Write only if content changed (atomically, via temp file + rename). Returns True if written."""
     try:
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        if os.path.exists(path):
-            with open(path, "r", encoding="utf-8") as rf:
-                if rf.read() == text:
-                    return False
-        with open(path, "w", encoding="utf-8") as wf:
-            wf.write(text)
+        _ensure_dir(os.path.dirname(path))
+        data = text.encode("utf-8")
+        try:
+            # Different size means changed; only read the old file when sizes match
+            if os.path.getsize(path) == len(data):
+                with open(path, "rb") as rf:
+                    if rf.read() == data:
+                        return False
+        except FileNotFoundError:
+            pass
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as wf:
+            wf.write(data)
+        os.replace(tmp, path)
         return True
     except Exception as e:
         print(f"[error] write failed for {path}: {e}", file=sys.stderr)
         return False
 
 def load_history(slug: str):
-    os.makedirs(HIST_DIR, exist_ok=True)
+    _ensure_dir(HIST_DIR)
     path = os.path.join(HIST_DIR, f"{slug}.json")
     try:
         if os.path.exists(path):
-            with open(path, "r", encoding="utf-8") as f:
-                return json.load(f)
+            return _json_loads(path)
     except Exception as e:
         print(f"[warn] Failed to read history {path}: {e}", file=sys.stderr)
     return []
 
 def save_history(slug: str, items: list):
-    os.makedirs(HIST_DIR, exist_ok=True)
     path = os.path.join(HIST_DIR, f"{slug}.json")
     try:
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(items, f, indent=2, ensure_ascii=False)
+        _write_if_changed(path, _json_dumps(items))
     except Exception as e:
         print(f"[error] Failed to write history {path}: {e}", file=sys.stderr)
 
-def _event_key(it):
+def _event_epoch(event_iso: str) -> float:
     try:
-        return datetime.fromisoformat(it.get("eventUtc","")).timestamp()
+        return datetime.fromisoformat(event_iso).timestamp()
     except Exception:
         return 0.0
 
+def _event_key(it):
+    # New items carry eventEpoch (set when built); older history entries fall back to parsing
+    ep = it.get("eventEpoch")
+    return ep if ep is not None else _event_epoch(it.get("eventUtc",""))
+
 def merge_items(existing: list, new_items: list, cap: int):
+    # (ts, item) per guid so each eventUtc is parsed once, not per comparison
     by_guid = {}
     for it in existing:
-        by_guid[it.get("guid","")] = it
+        by_guid[it.get("guid","")] = (_event_key(it), it)
     for it in new_items:
-        by_guid[it.get("guid","")] = it
-    merged = sorted(by_guid.values(), key=_event_key, reverse=True)
-    return merged[:cap]
+        by_guid[it.get("guid","")] = (_event_key(it), it)
+    # Top-`cap` only: O(n log cap), same order as sorted(..., reverse=True)[:cap] (ties stay stable)
+    return [it for _, it in heapq.nlargest(cap, by_guid.values(), key=itemgetter(0))]
 
 def rss_escape(s: str) -> str:
     return (s or "").replace("&","&amp;").replace("<","&lt;").replace(">","&gt;")
 
+MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+def _fmt_mdhm(dt: datetime) -> str:
+    """'%b %d, %H:%M' without strftime (C-locale month names, as VF prints them)."""
+    return f"{MONTHS[dt.month - 1]} {dt.day:02d}, {dt.hour:02d}:{dt.minute:02d}"
+
+_MONTH_NUM = {m.lower(): i for i, m in enumerate(MONTHS, 1)}
+# VF stamps: '%b %d, %H:%M', '%b %d, %I:%M %p' or '%b %d, %H:%M:%S' (same whitespace rules as strptime)
+_MDHM_RE = re.compile(
+    r"(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)\s+(\d{1,2}),\s+(\d{1,2}):(\d{1,2})"
+    r"(?::(\d{1,2}))?(?:\s+(am|pm))?",
+    re.IGNORECASE | re.ASCII,
+)
+
+def _parse_mdhm(raw: str, allow_seconds: bool = True):
+    """Hand-rolled strptime for VF stamps; naive datetime in the current year, or None."""
+    m = _MDHM_RE.fullmatch(raw)
+    if not m:
+        return None
+    mon, day, hh, mm, ss, ampm = m.groups()
+    hour = int(hh)
+    if ampm:
+        if ss is not None or not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if ampm.lower() == "pm" else 0)
+    elif ss is not None and not allow_seconds:
+        return None
+    try:
+        return datetime(RUN_NOW.year, _MONTH_NUM[mon.lower()], int(day), hour, int(mm), int(ss or 0))
+    except ValueError:
+        return None
+
 def to_rfc2822(dt: datetime) -> str:
     return dt.astimezone(timezone.utc).strftime("%a, %d %b %Y %H:%M:%S GMT")
 
-def make_id(s: str) -> str:
-    return hashlib.sha1((s or "").encode("utf-8")).hexdigest()
+# One timestamp per run (the workflow invokes the script once per tick); used for
+# every new item's pubDate, the feeds' lastBuildDate and all "now" comparisons.
+RUN_NOW = datetime.now(timezone.utc)
+RUN_PUB = to_rfc2822(RUN_NOW)
 
 # ---- TBA filtering ----
 SKIP_TBA = {
@@ -321,40 +413,50 @@ def _is_tba(item: dict) -> bool:
 
 # ---- Canonical de-dupe (Option C)
 
-@lru_cache(maxsize=512)
+class _NonAlnumTable(dict):
+    """str.translate table: keep ASCII a-z/0-9, map everything else to a space."""
+    def __missing__(self, cp):
+        v = cp if (97 <= cp <= 122 or 48 <= cp <= 57) else " "
+        self[cp] = v
+        return v
+
+_NON_ALNUM = _NonAlnumTable()
+
+@lru_cache(maxsize=4096)
 def _normalize_port_name(name: str) -> str:
-    s = (name or "").lower()
-    s = re.sub(r"[^a-z0-9]+", " ", s).strip()
+    s = " ".join((name or "").lower().translate(_NON_ALNUM).split())
     s = s.replace("cape canaveral", "port canaveral")
-    s = s.replace("ft lauderdale", "fort lauderdale")
-    return re.sub(r"\s+", " ", s)
+    return s.replace("ft lauderdale", "fort lauderdale")
+
+# SHA-1 state after the constant "canon|" prefix; copied per GUID (same digest as hashing the full key)
+_CANON_SHA1 = hashlib.sha1(b"canon|")
+
+@lru_cache(maxsize=8192)
+def _canonical_guid_cached(slug: str, verb_lc: str, port_norm: str, minute_iso: str) -> str:
+    h = _CANON_SHA1.copy()
+    h.update(f"{slug}|{verb_lc}|{port_norm}|{minute_iso}".encode("utf-8"))
+    return h.hexdigest()
+
+def _canonical_guid_at(slug: str, verb: str, port: str, dt: datetime) -> str:
+    dt = dt.astimezone(timezone.utc).replace(second=0, microsecond=0)
+    return _canonical_guid_cached(slug, verb.lower(), _normalize_port_name(port), dt.isoformat())
+
+@lru_cache(maxsize=65536)
+def _canonical_guid_memo(slug: str, verb: str, port: str, event_iso: str) -> str:
+    # Raises on unparseable times; lru_cache never stores those, so "now" is never frozen.
+    return _canonical_guid_at(slug, verb, port, datetime.fromisoformat(event_iso))
 
 def _canonical_guid(slug: str, verb: str, port: str, event_iso: str) -> str:
     """Canonical ID by ship + verb + normalized port + UTC minute."""
     try:
-        dt = datetime.fromisoformat(event_iso)
+        return _canonical_guid_memo(slug, verb, port, event_iso)
     except Exception:
-        dt = datetime.utcnow().replace(tzinfo=timezone.utc)
-    dt = dt.astimezone(timezone.utc).replace(second=0, microsecond=0)
-    key = f"canon|{slug}|{verb.lower()}|{_normalize_port_name(port)}|{dt.isoformat()}"
-    return make_id(key)
+        return _canonical_guid_at(slug, verb, port, RUN_NOW)
 
 # ---- XML formatting knobs ----
-PRETTY_XML = os.getenv("PRETTY_XML", "1") == "1"
 USE_CDATA  = True
 STYLESHEET_NAME = "rss-dcl.xsl"   # written to docs/
 
-def _pretty_xml(xml_str: str) -> str:
-    if not PRETTY_XML:
-        return xml_str
-    try:
-        from xml.dom import minidom
-        dom = minidom.parseString(xml_str.encode("utf-8"))
-        pretty = dom.toprettyxml(indent="  ", encoding="UTF-8").decode("utf-8")
-        return "\n".join([ln for ln in pretty.splitlines() if ln.strip()])
-    except Exception:
-        return xml_str
-
 def _cdata(s: str) -> str:
     s = s or ""
     parts = s.split("]]>")
@@ -362,7 +464,7 @@ def _cdata(s: str) -> str:
 
 def _ensure_stylesheet_dcl():
     try:
-        os.makedirs(DOCS_DIR, exist_ok=True)
+        _ensure_dir(DOCS_DIR)
         xsl_path = os.path.join(DOCS_DIR, STYLESHEET_NAME)
         xsl = """<?xml version="1.0" encoding="UTF-8"?>
 <xsl:stylesheet xmlns:xsl="http://www.w3.org/1999/XSL/Transform" version="1.0">
@@ -527,7 +629,16 @@ def build_rss(channel_title: str, channel_link: str, items: list, stylesheet=Non
     if use_cdata is None:
         use_cdata = USE_CDATA
 
-    xml_items = []
+    # Emitted already indented (no DOM reparse); one join at the end
+    pi = f'\n<?xml-stylesheet type="text/xsl" href="{stylesheet}"?>' if stylesheet else ""
+    out = [f"""<?xml version="1.0" encoding="UTF-8"?>{pi}
+<rss version="2.0">
+<channel>
+  <title>{rss_escape(channel_title)}</title>
+  <link>{rss_escape(channel_link)}</link>
+  <description>{rss_escape(channel_title)} - Auto-generated</description>
+  <lastBuildDate>{RUN_PUB}</lastBuildDate>
+"""]
     for it in items:
         title = rss_escape(it.get("title",""))
         link  = rss_escape(it.get("link",""))
@@ -536,47 +647,49 @@ def build_rss(channel_title: str, channel_link: str, items: list, stylesheet=Non
         desc  = it.get("description","")
         desc_xml = _cdata(desc) if use_cdata else rss_escape(desc)
 
-        xml_items.append(f"""
-  <item>
+        out.append(f"""  <item>
     <title>{title}</title>
     <link>{link}</link>
     <guid isPermaLink="false">{guid}</guid>
     <pubDate>{pub}</pubDate>
     <description>{desc_xml}</description>
-  </item>""")
+  </item>
+""")
+    out.append("</channel>\n</rss>\n")
+    return "".join(out)
 
-    pi = f'\n<?xml-stylesheet type="text/xsl" href="{stylesheet}"?>' if stylesheet else ""
-    xml = f"""<?xml version="1.0" encoding="UTF-8"?>{pi}
-<rss version="2.0">
-<channel>
-  <title>{rss_escape(channel_title)}</title>
-  <link>{rss_escape(channel_link)}</link>
-  <description>{rss_escape(channel_title)} - Auto-generated</description>
-  <lastBuildDate>{to_rfc2822(datetime.utcnow())}</lastBuildDate>
-  {''.join(xml_items)}
-</channel>
-</rss>
-"""
-    return xml
+_LAST_BUILD_RE = re.compile(r"<lastBuildDate>.*?</lastBuildDate>")
+
+def _write_feed(paths, channel_title: str, channel_link: str, items: list):
+    """
+    build_rss once and write it to each of `paths`, skipping a file whose content differs
+    from the new feed only in lastBuildDate (so no-op runs don't rewrite every feed).
+    """
+    xml = build_rss(channel_title, channel_link, items)
+    body = _LAST_BUILD_RE.sub("", xml, 1)
+    for p in paths:
+        try:
+            with open(p, "r", encoding="utf-8") as f:
+                if _LAST_BUILD_RE.sub("", f.read(), 1) == body:
+                    continue
+        except (OSError, ValueError):
+            pass   # missing/unreadable: write it
+        _write_if_changed(p, xml)
 
 # ---------- Time handling ----------
 
 def _parse_vf_time_utc(raw_time: str):
     if not raw_time:
         return None
-    raw = raw_time.strip()
-    fmts = ["%b %d, %H:%M", "%b %d, %I:%M %p", "%b %d, %H:%M:%S"]
-    for fmt in fmts:
-        try:
-            dt = datetime.strptime(raw, fmt)
-            return dt.replace(year=datetime.utcnow().year, tzinfo=timezone.utc)
-        except Exception:
-            continue
-    return None
+    dt = _parse_mdhm(raw_time.strip())
+    return dt.replace(tzinfo=timezone.utc) if dt else None
+
+_PORT_CC_RE = re.compile(r"/ports/([A-Z]{2})")
 
+@lru_cache(maxsize=512)
 def _port_zoneinfo_from_link(port_link: str):
     try:
-        m = re.search(r"/ports/([A-Z]{2})", port_link or "")
+        m = _PORT_CC_RE.search(port_link or "")
         if not m: return None
         cc = m.group(1)
         tz = TZ_BY_PORT_PREFIX.get(cc)
@@ -584,22 +697,22 @@ def _port_zoneinfo_from_link(port_link: str):
     except Exception:
         return None
 
+@lru_cache(maxsize=512)
 def _port_zoneinfo_from_name(port_name: str):
     if not port_name:
-        return zinfo_eastern()
+        return _EASTERN
     name = port_name.lower()
     for needle, tz in PORT_TZ_MAP:
         if needle in name:
             return zinfo(tz)
-    return zinfo_eastern()
+    return _EASTERN
 
 def format_times_for_notification(port_name: str, port_link: str, when_raw: str):
     dt_utc = _parse_vf_time_utc(when_raw)
     if not dt_utc:
         return None, None, None
 
-    eastern = zinfo_eastern()
-    est_dt = dt_utc.astimezone(eastern) if eastern else dt_utc
+    est_dt = dt_utc.astimezone(_EASTERN) if _EASTERN else dt_utc
     est_str = est_dt.strftime("%b %d, %I:%M %p %Z")
 
     tz_local = _port_zoneinfo_from_link(port_link) or _port_zoneinfo_from_name(port_name)
@@ -610,59 +723,165 @@ def format_times_for_notification(port_name: str, port_link: str, when_raw: str)
 
 # ---------- Browser pooling ----------
 
+_UA_DESKTOP = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+               "(KHTML, like Gecko) Chrome/120 Safari/537.36")
+_UA_MOBILE  = ("Mozilla/5.0 (Linux; Android 12; Pixel 5) AppleWebKit/537.36 "
+               "(KHTML, like Gecko) Chrome/120 Mobile Safari/537.36")
+
+# Resource types the parsers never look at; JS stays enabled so port calls still render.
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font", "stylesheet"})
+# Ad/analytics hosts (matched as the host or a parent domain); their scripts never feed the tables.
+BLOCKED_HOST_SUFFIXES = (
+    "googletagmanager.com", "google-analytics.com", "doubleclick.net",
+    "googlesyndication.com", "adservice.google.com", "amazon-adsystem.com",
+    "scorecardresearch.com", "quantserve.com", "facebook.net",
+)
+
+@lru_cache(maxsize=1024)
+def _is_blocked_host(host: str) -> bool:
+    return any(host == sfx or host.endswith("." + sfx) for sfx in BLOCKED_HOST_SUFFIXES)
+
+async def _block_heavy_resources(route):
+    req = route.request
+    if req.resource_type in BLOCKED_RESOURCE_TYPES or _is_blocked_host(urlparse(req.url).hostname or ""):
+        await route.abort()
+    else:
+        await route.continue_()
+
 class BrowserPool:
-    """Reuse one headless Chromium with two contexts (desktop + mobile)."""
-    def __init__(self, p):
-        self.browser = p.chromium.launch(headless=True)
-        self.ctx_desktop = self.browser.new_context(
-            user_agent=("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
-                        "(KHTML, like Gecko) Chrome/120 Safari/537.36"),
+    """
+    One headless Chromium with two shared contexts (desktop + mobile), each holding a
+    queue of warm pages. Renders borrow a page and hand it back, so contexts and pages
+    are created once per run instead of per ship/URL. The mobile context only serves
+    retries, so it is created on first use.
+    """
+    def __init__(self, browser, ctx_desktop, size: int):
+        self.browser = browser
+        self.size = size
+        self.ctx_desktop = ctx_desktop
+        self.ctx_mobile = None
+        self.pages_desktop = asyncio.Queue()
+        self.pages_mobile = asyncio.Queue()
+        self._mobile_lock = asyncio.Lock()
+        self.port_renders = {}   # (url, mobile | "http") -> Task[str]; port pages are shared between ships
+
+    @classmethod
+    async def launch(cls, p, size: int = None):
+        browser = await p.chromium.launch(headless=True)
+        ctx_desktop = await browser.new_context(
+            user_agent=_UA_DESKTOP,
             viewport={"width": 1366, "height": 2000}
         )
-        self.ctx_mobile = self.browser.new_context(
-            user_agent=("Mozilla/5.0 (Linux; Android 12; Pixel 5) AppleWebKit/537.36 "
-                        "(KHTML, like Gecko) Chrome/120 Mobile Safari/537.36"),
-            viewport={"width": 412, "height": 1800},
-            device_scale_factor=2
-        )
-        self.page_desktop = self.ctx_desktop.new_page()
-        self.page_mobile  = self.ctx_mobile.new_page()
-
-    def close(self):
+        # Register once per context (not per navigation) so handlers don't stack up
+        await ctx_desktop.route("**/*", _block_heavy_resources)
+        pool = cls(browser, ctx_desktop, size or PAGE_POOL_SIZE)
+        for _ in range(pool.size):
+            await pool.pages_desktop.put(await ctx_desktop.new_page())
+        return pool
+
+    async def pages_for(self, mobile: bool) -> asyncio.Queue:
+        if not mobile:
+            return self.pages_desktop
+        async with self._mobile_lock:
+            if self.ctx_mobile is None:
+                ctx = await self.browser.new_context(
+                    user_agent=_UA_MOBILE,
+                    viewport={"width": 412, "height": 1800},
+                    device_scale_factor=2
+                )
+                await ctx.route("**/*", _block_heavy_resources)
+                for _ in range(self.size):
+                    await self.pages_mobile.put(await ctx.new_page())
+                self.ctx_mobile = ctx
+        return self.pages_mobile
+
+    async def close(self):
         try:
-            self.ctx_desktop.close()
+            await self.ctx_desktop.close()
         finally:
             try:
-                self.ctx_mobile.close()
+                if self.ctx_mobile is not None:
+                    await self.ctx_mobile.close()
             finally:
-                self.browser.close()
+                await self.browser.close()
+
+PORT_CALLS_FRAGMENT_JS = r"""() => {
+  if (!document.body) return null;
+  const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT);
+  let node = null;
+  while (walker.nextNode()) {
+    if (walker.currentNode.nodeValue.trim().toLowerCase() === "recent port calls") {
+      node = walker.currentNode.parentElement;
+      break;
+    }
+  }
+  while (node && !/arrival \(utc\)|ata \(utc\)/i.test(node.textContent)) node = node.parentElement;
+  return node ? node.outerHTML : null;
+}"""
 
-def _rendered_html(url: str, pool: "BrowserPool", mobile: bool, wait_selector: str = None, wait_text: str = None):
-    page = pool.page_mobile if mobile else pool.page_desktop
+async def _rendered_html(url: str, pool: BrowserPool, mobile: bool, wait_selector: str = None, wait_text: str = None,
+                         fragment_js: str = None, wait_timeout: int = 6000):
+    """
+    Navigate a pooled page and return its HTML (or fragment_js's result). Readiness is the
+    explicit text/selector waits only; there is no networkidle wait, which VF's long-lived
+    ad/telemetry connections kept open until its timeout on nearly every load.
+    """
+    pages = await pool.pages_for(mobile)
+    page = await pages.get()
     html = ""
     try:
-        page.goto(url, timeout=30000, wait_until="domcontentloaded")
+        await page.goto(url, timeout=15000, wait_until="domcontentloaded")
         if wait_text:
-            try: page.wait_for_selector(f"text={wait_text}", timeout=6000)
+            try: await page.wait_for_selector(f"text={wait_text}", timeout=wait_timeout)
             except PWTimeout: pass
         if wait_selector:
-            try: page.wait_for_selector(wait_selector, timeout=6000)
+            try: await page.wait_for_selector(wait_selector, timeout=wait_timeout)
             except PWTimeout: pass
-        try: page.wait_for_load_state("networkidle", timeout=4000)
-        except PWTimeout: pass
-        html = page.content()
+        if fragment_js:
+            try: html = await page.evaluate(fragment_js) or ""
+            except Exception: html = ""
+        if not html:
+            html = await page.content()
         if not html:
             # one soft retry
-            _sleep_jitter()
-            html = page.content()
+            await _sleep_jitter()
+            html = await page.content()
     except Exception:
         html = ""
-    if _looks_blocked(html) and not mobile:
-        _sleep_jitter()
-        parsed = urlparse(url)
-        mobile_url = urlunparse(parsed._replace(netloc="www.vesselfinder.com"))
-        return _rendered_html(mobile_url, pool, mobile=True, wait_selector=wait_selector, wait_text=wait_text)
-    _sleep_jitter()
+    finally:
+        pages.put_nowait(page)
+    # Block pages parse to zero rows; callers then retry once on a mobile page.
+    await _sleep_jitter()
+    return html
+
+# ---------- Plain HTTP fast path ----------
+
+_SESSION = requests.Session()
+_SESSION.headers.update({
+    "User-Agent": _UA_DESKTOP,
+    "Accept": "text/html,application/xhtml+xml",
+})
+
+def _try_http(url: str, must_contain=(), timeout=20) -> str:
+    """
+    GET via the shared keep-alive session. Returns the HTML only when it is not a
+    block page and contains one of `must_contain` (lowercase); otherwise "" so the
+    caller falls back to Playwright.
+    """
+    try:
+        resp = _SESSION.get(url, timeout=timeout)
+        if resp.status_code != 200:
+            return ""
+        html = resp.text
+    except Exception as e:
+        print(f"[info] HTTP fetch failed for {url}: {e}")
+        return ""
+    if _looks_blocked(html):
+        return ""
+    if must_contain:
+        low = html.lower()
+        if not any(k in low for k in must_contain):
+            return ""
     return html
 
 # ---------- VF ship-page scraping ----------
@@ -688,20 +907,23 @@ def _find_root(soup: BeautifulSoup):
                 return node
     return None
 
+_VF_ARR_LABELS = ("arrival (utc)", "ata (utc)")
+_VF_DEP_LABELS = ("departure (utc)", "atd (utc)")
+_VF_LABELS = _VF_ARR_LABELS + _VF_DEP_LABELS
+
 def _parse_vf(html: str):
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, _HTML_PARSER)
     root = _find_root(soup)
     results = []
     if not root:
         return results
 
-    def block_has_labels(block: Tag) -> bool:
-        txt = (block.get_text(" ", strip=True) or "").lower()
-        return any(k in txt for k in ("arrival (utc)", "departure (utc)", "ata (utc)", "atd (utc)"))
-
-    def value_after_label(matched: Tag, label_keys):
+    def value_after_label(matched: Tag, matched_txt: str, label_keys):
         lab_node = None
         for key in label_keys:
+            # A label string always shows up in the block's joined text; skip the tree search if absent
+            if key not in matched_txt:
+                continue
             lab_node = matched.find(string=lambda s: isinstance(s, str) and key in s.lower())
             if lab_node: break
         if not lab_node:
@@ -720,19 +942,22 @@ def _parse_vf(html: str):
             pass
         return ""
 
-    blocks = [c for c in root.find_all(recursive=False) if isinstance(c, Tag)]
-    for block in blocks:
-        candidates = [block] + [c for c in block.find_all(recursive=False) if isinstance(c, Tag)]
-        matched = next((c for c in candidates if block_has_labels(c)), None)
-        if not matched:
+    for block in root.children:
+        if not isinstance(block, Tag):
             continue
+        # A child's joined text is a substring of its block's, so if the block carries no
+        # labels none of its children can; the block itself is the only candidate.
+        matched_txt = (block.get_text(" ", strip=True) or "").lower()
+        if not any(k in matched_txt for k in _VF_LABELS):
+            continue
+        matched = block
 
         a = matched.find("a")
         port_name = a.get_text(strip=True) if a else "Unknown Port"
         port_link = a["href"] if (a and a.has_attr("href")) else ""
 
-        arr_val = value_after_label(matched, ["arrival (utc)", "ata (utc)"])
-        dep_val = value_after_label(matched, ["departure (utc)", "atd (utc)"])
+        arr_val = value_after_label(matched, matched_txt, _VF_ARR_LABELS)
+        dep_val = value_after_label(matched, matched_txt, _VF_DEP_LABELS)
 
         if arr_val is not None:
             if arr_val:
@@ -752,11 +977,18 @@ def _parse_vf(html: str):
 
     return results
 
-def _vf_events_for_ship(pool: "BrowserPool", ship):
+async def _vf_events_for_ship(pool: BrowserPool, ship):
     base_url = ship["url"]
+    # Server-rendered HTML first; only accept it if at least one row carries a time
+    html = await asyncio.to_thread(_try_http, base_url, ("recent port calls", "arrival (utc)", "ata (utc)"))
+    if html:
+        rows = _parse_vf(html)
+        if any(r.get("when_raw") for r in rows):
+            return rows, base_url
     # Desktop first
     try:
-        html = _rendered_html(base_url, pool, mobile=False, wait_text="Recent Port Calls")
+        html = await _rendered_html(base_url, pool, mobile=False, wait_text="Recent Port Calls",
+                                    fragment_js=PORT_CALLS_FRAGMENT_JS)
         rows = _parse_vf(html)
         if rows: return rows, base_url
     except Exception as e:
@@ -765,20 +997,22 @@ def _vf_events_for_ship(pool: "BrowserPool", ship):
     try:
         parsed = urlparse(base_url)
         mobile_url = urlunparse(parsed._replace(netloc="www.vesselfinder.com"))
-        html = _rendered_html(mobile_url, pool, mobile=True, wait_text="Recent Port Calls")
+        html = await _rendered_html(mobile_url, pool, mobile=True, wait_text="Recent Port Calls",
+                                    fragment_js=PORT_CALLS_FRAGMENT_JS)
         rows = _parse_vf(html)
         if rows: return rows, mobile_url
     except Exception as e:
         print(f"[warn] mobile VF render failed for {ship['name']}: {e}", file=sys.stderr)
     return [], base_url
 
-# ---------- CruiseMapper coordinate scrape (HTTP, no Playwright) ----------
+# ---------- CruiseMapper coordinate scrape (HTTP via shared session, no Playwright) ----------
 
 COORD_RE = re.compile(
     r'([+-]?\d+(?:\.\d+)?)\s*[°]?\s*([NS])?\s*[,/ ]\s*([+-]?\d+(?:\.\d+)?)\s*[°]?\s*([EW])?',
     re.IGNORECASE
 )
 
+@lru_cache(maxsize=64)
 def _cm_slug(name: str) -> str:
     return "-".join(part for part in name.split())
 
@@ -791,30 +1025,37 @@ def _parse_coords(text: str):
     if ew and ew.upper() == "W": lon = -abs(lon)
     return (lat, lon)
 
+CM_COORD_SELECTOR = "[class*='coord' i], [id*='coord' i], meta[name*='geo' i]"
+
+def _coords_from_soup(soup: BeautifulSoup):
+    """Try the elements likely to carry coordinates first; full-page text only as a last resort."""
+    for el in soup.select(CM_COORD_SELECTOR):
+        # geo.position / ICBM metas use "lat;lon"
+        txt = (el.get("content") or "").replace(";", ",") if el.name == "meta" else el.get_text(" ", strip=True)
+        coords = _parse_coords(txt)
+        if coords:
+            return coords
+    return _parse_coords(soup.get_text(" ", strip=True))
+
+def _cm_url(ship: dict) -> str:
+    return ship.get("cm_url") or f"https://www.cruisemapper.com/ships/{_cm_slug(ship.get('name') or '')}"
+
 def _cm_fetch_coords_http(cm_url: str, timeout=20):
     try:
-        req = urllib.request.Request(
-            cm_url,
-            headers={"User-Agent": ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                                    "AppleWebKit/537.36 (KHTML, like Gecko) "
-                                    "Chrome/120 Safari/537.36")}
-        )
-        with urllib.request.urlopen(req, timeout=timeout) as resp:
-            html = resp.read().decode("utf-8", errors="ignore")
-        soup = BeautifulSoup(html, "html.parser")
-        txt = soup.get_text(" ", strip=True)
-        return _parse_coords(txt)
+        resp = _SESSION.get(cm_url, timeout=timeout)
+        resp.raise_for_status()
+        html = resp.text
+        soup = BeautifulSoup(html, _HTML_PARSER)
+        return _coords_from_soup(soup)
     except Exception as e:
         print(f"[warn] CruiseMapper HTTP failed: {e}", file=sys.stderr)
         return None
 
-def haversine_km(a, b):
-    R = 6371.0
-    lat1, lon1 = math.radians(a[0]), math.radians(a[1])
-    lat2, lon2 = math.radians(b[0]), math.radians(b[1])
+def _haversine_km_rad(lat1, lon1, cos1, lat2, lon2, cos2):
+    """Great-circle distance in km from radians, with the latitudes' cosines precomputed."""
     dlat = lat2 - lat1; dlon = lon2 - lon1
-    h = math.sin(dlat/2)**2 + math.cos(lat1)*math.cos(lat2)*math.sin(dlon/2)**2
-    return 2*R*math.asin(math.sqrt(h))
+    h = math.sin(dlat/2)**2 + cos1*cos2*math.sin(dlon/2)**2
+    return 2*6371.0*math.asin(math.sqrt(h))
 
 def geofence_events_from_coords(ship_name: str, slug: str, coords, state_seen):
     items = []
@@ -822,13 +1063,19 @@ def geofence_events_from_coords(ship_name: str, slug: str, coords, state_seen):
         return items
 
     geo_state = state_seen.setdefault("geo", {}).setdefault(slug, {})
-    now_utc = datetime.utcnow().replace(tzinfo=timezone.utc)
-
-    for fence_name, info in SPECIAL_GEOFENCES.items():
-        center = info["center"]
-        radius = info["radius_km"]
-        dist = haversine_km(coords, center)
-        inside = dist <= radius
+    now_utc = RUN_NOW
+    when_raw = _fmt_mdhm(now_utc)
+
+    ship_lat, ship_lon = math.radians(coords[0]), math.radians(coords[1])
+    ship_cos = math.cos(ship_lat)
+
+    for fence_name, f_lat, f_lon, f_cos, radius, lat_span, lon_span in _FENCES:
+        dlon = abs(ship_lon - f_lon)
+        if dlon > math.pi:
+            dlon = 2 * math.pi - dlon
+        # Outside the bounding box means outside the circle; skip the trig
+        inside = (abs(ship_lat - f_lat) <= lat_span and dlon <= lon_span and
+                  _haversine_km_rad(ship_lat, ship_lon, ship_cos, f_lat, f_lon, f_cos) <= radius)
         key = fence_name
         prev = geo_state.get(key)
 
@@ -837,20 +1084,20 @@ def geofence_events_from_coords(ship_name: str, slug: str, coords, state_seen):
             continue
 
         if inside and not prev:
-            when_raw = now_utc.strftime("%b %d, %H:%M")
             est_str, local_str, event_iso = format_times_for_notification(fence_name, "", when_raw)
             title = f"{ship_name} Arrived at {fence_name} at {est_str or 'time TBD ET'}"
             if local_str:
                 title += f". The local time to the port is {local_str}"
-            desc = f"{fence_name} Arrival (UTC) {now_utc.strftime('%b %d, %H:%M')} — Geofence"
+            desc = f"{fence_name} Arrival (UTC) {when_raw} — Geofence"
             guid = _canonical_guid(slug, "Arrived", fence_name, event_iso or now_utc.isoformat())
             items.append({
                 "title": title,
                 "description": desc,
                 "link": "",
                 "guid": guid,
-                "pubDate": to_rfc2822(now_utc),
+                "pubDate": RUN_PUB,
                 "eventUtc": event_iso or now_utc.isoformat(),
+                "eventEpoch": _event_epoch(event_iso) if event_iso else now_utc.timestamp(),
                 "shipSlug": slug,
                 "shipName": ship_name,
                 "source": "geo",
@@ -862,20 +1109,20 @@ def geofence_events_from_coords(ship_name: str, slug: str, coords, state_seen):
             })
 
         elif (not inside) and prev:
-            when_raw = now_utc.strftime("%b %d, %H:%M")
             est_str, local_str, event_iso = format_times_for_notification(fence_name, "", when_raw)
             title = f"{ship_name} Departed from {fence_name} at {est_str or 'time TBD ET'}"
             if local_str:
                 title += f". The local time to the port is {local_str}"
-            desc = f"{fence_name} Departure (UTC) {now_utc.strftime('%b %d, %H:%M')} — Geofence"
+            desc = f"{fence_name} Departure (UTC) {when_raw} — Geofence"
             guid = _canonical_guid(slug, "Departed", fence_name, event_iso or now_utc.isoformat())
             items.append({
                 "title": title,
                 "description": desc,
                 "link": "",
                 "guid": guid,
-                "pubDate": to_rfc2822(now_utc),
+                "pubDate": RUN_PUB,
                 "eventUtc": event_iso or now_utc.isoformat(),
+                "eventEpoch": _event_epoch(event_iso) if event_iso else now_utc.timestamp(),
                 "shipSlug": slug,
                 "shipName": ship_name,
                 "source": "geo",
@@ -892,6 +1139,7 @@ def geofence_events_from_coords(ship_name: str, slug: str, coords, state_seen):
 
 # ---------- Port-page fallback ----------
 
+@lru_cache(maxsize=1024)
 def _ensure_tab(url: str, tab: str) -> str:
     parsed = urlparse(url)
     qs = parse_qs(parsed.query)
@@ -900,19 +1148,24 @@ def _ensure_tab(url: str, tab: str) -> str:
     return urlunparse(parsed._replace(query=new_q))
 
 def _parse_port_time_lt(raw_time: str, tz: ZoneInfo):
-    raw = (raw_time or "").strip()
-    for fmt in ("%b %d, %H:%M", "%b %d, %I:%M %p"):
-        try:
-            base = datetime.strptime(raw, fmt).replace(year=datetime.utcnow().year)
-            local = base.replace(tzinfo=tz)
-            utc_dt = local.astimezone(timezone.utc)
-            eastern = zinfo_eastern()
-            est_dt = utc_dt.astimezone(eastern) if eastern else utc_dt
-            return est_dt.strftime("%b %d, %I:%M %p %Z"), local.strftime("%b %d, %I:%M %p %Z"), utc_dt.isoformat()
-        except Exception:
-            continue
-    return None, None, None
+    return _parse_port_time_lt_cached((raw_time or "").strip(), tz.key if tz else None)
+
+@lru_cache(maxsize=4096)
+def _parse_port_time_lt_cached(raw: str, tz_key: str):
+    # Port tables repeat the same timestamps across tabs and ships; key on the zone name.
+    tz = zinfo(tz_key) if tz_key else None
+    base = _parse_mdhm(raw, allow_seconds=False)
+    if not base:
+        return None, None, None
+    try:
+        local = base.replace(tzinfo=tz)
+        utc_dt = local.astimezone(timezone.utc)
+        est_dt = utc_dt.astimezone(_EASTERN) if _EASTERN else utc_dt
+        return est_dt.strftime("%b %d, %I:%M %p %Z"), local.strftime("%b %d, %I:%M %p %Z"), utc_dt
+    except Exception:
+        return None, None, None
 
+@lru_cache(maxsize=512)
 def _port_tz_from_url(port_url: str, fallback_name: str):
     tz = _port_zoneinfo_from_link(port_url)
     if tz: return tz
@@ -923,7 +1176,11 @@ def _parse_port_table_for_ship(html: str, ship_name: str, port_url: str, tab_kin
     Parse a VF port Arrivals/Departures page and emit rows for the named ship.
     tab_kind: 'arrivals' or 'departures'
     """
-    soup = BeautifulSoup(html, "html.parser")
+    needle = ship_name.lower()
+    # Most port pages don't list this ship at all; skip the soup parse for those
+    if not html or needle not in html.lower():
+        return []
+    soup = BeautifulSoup(html, _HTML_PARSER)
     table = soup.find("table")
     if not table:
         return []
@@ -936,8 +1193,7 @@ def _parse_port_table_for_ship(html: str, ship_name: str, port_url: str, tab_kin
         tds = tr.find_all("td")
         if len(tds) < 2:
             continue
-        txt = tr.get_text(" ", strip=True)
-        if ship_name.lower() not in txt.lower():
+        if needle not in tr.get_text(" ", strip=True).lower():
             continue
 
         candidates = []
@@ -947,166 +1203,262 @@ def _parse_port_table_for_ship(html: str, ship_name: str, port_url: str, tab_kin
             candidates.append(tds[1].get_text(strip=True))
         lt = next((c for c in candidates if c), "").replace("(LT)", "").replace("LT", "").strip()
 
-        est_str, local_str, iso_utc = _parse_port_time_lt(lt, tz)
-        if not iso_utc:
+        est_str, local_str, utc_dt = _parse_port_time_lt(lt, tz)
+        if not utc_dt:
             continue
 
         event = "Arrived" if tab_kind == "arrivals" else "Departed"
         port_name = port_label
-        detail = f"{port_name} {'Arrival' if event=='Arrived' else 'Departure'} (UTC) {datetime.fromisoformat(iso_utc).strftime('%b %d, %H:%M')}"
+        when_str = _fmt_mdhm(utc_dt)
+        detail = f"{port_name} {'Arrival' if event=='Arrived' else 'Departure'} (UTC) {when_str}"
 
         rows.append({
             "event": event,
             "port": port_name,
-            "when_raw": datetime.fromisoformat(iso_utc).strftime("%b %d, %H:%M"),
+            "when_raw": when_str,
             "link": port_url,
             "detail": detail,
             "_est": est_str,
             "_local": local_str,
-            "_iso": iso_utc,
+            "_iso": utc_dt.isoformat(),
             "_source": f"port:{tab_kind}"
         })
     return rows
 
-def _fetch_port_fallback_events(pool: "BrowserPool", ship_name: str, candidate_links_with_labels: list):
+async def _port_page_html(pool: BrowserPool, url: str, mobile: bool) -> str:
+    """Render a port page at most once per run; concurrent callers await the same task."""
+    key = (url, mobile)
+    task = pool.port_renders.get(key)
+    if task is None:
+        task = pool.port_renders[key] = asyncio.ensure_future(
+            _rendered_html(url, pool, mobile=mobile, wait_selector="table tr td", wait_timeout=3000))
+    return await task
+
+async def _port_page_static(pool: BrowserPool, url: str) -> str:
+    """Plain-HTTP port page, fetched at most once per run ("" if blocked/failed)."""
+    key = (url, "http")
+    task = pool.port_renders.get(key)
+    if task is None:
+        task = pool.port_renders[key] = asyncio.ensure_future(asyncio.to_thread(_try_http, url))
+    return await task
+
+async def _port_tab_rows(pool: BrowserPool, ship_name: str, port_url: str, abs_url: str, label: str, tab: str):
+    try:
+        url = _ensure_tab(abs_url, tab)
+        # Server-rendered HTML first; only trusted when it already yields rows for this ship
+        html = await _port_page_static(pool, url)
+        rows = _parse_port_table_for_ship(html, ship_name, port_url, tab, label or port_url)
+        if not rows:
+            html = await _port_page_html(pool, url, mobile=False)
+            rows = _parse_port_table_for_ship(html, ship_name, port_url, tab, label or port_url)
+        if not rows:
+            parsed = urlparse(url)
+            mobile_url = urlunparse(parsed._replace(netloc="www.vesselfinder.com"))
+            html_m = await _port_page_html(pool, mobile_url, mobile=True)
+            rows = _parse_port_table_for_ship(html_m, ship_name, port_url, tab, label or port_url)
+        return rows
+    except Exception as e:
+        print(f"[warn] Port fallback {label or port_url} ({tab}) failed: {e}", file=sys.stderr)
+        return []
+
+async def _fetch_port_fallback_events(pool: BrowserPool, ship_name: str, candidate_links_with_labels: list):
     """
-    Try multiple port links (and both tabs). Each candidate is (port_url, port_label).
-    Returns aggregated rows for the ship across all tried pages.
+    Try multiple port links (and both tabs) concurrently. Each candidate is (port_url, port_label).
+    Returns aggregated rows for the ship across all tried pages, in candidate order.
     """
+    absolute = [(port_url, urljoin("https://www.vesselfinder.com", port_url), label)
+                for port_url, label in candidate_links_with_labels]
+    results = await asyncio.gather(*(
+        _port_tab_rows(pool, ship_name, port_url, abs_url, label, tab)
+        for port_url, abs_url, label in absolute
+        for tab in ("departures", "arrivals")
+    ))
     out = []
     seen = set()
-    for port_url, label in candidate_links_with_labels:
-        for tab in ("departures", "arrivals"):
-            try:
-                url = _ensure_tab(urljoin("https://www.vesselfinder.com", port_url), tab)
-                html = _rendered_html(url, pool, mobile=False, wait_selector="table")
-                rows = _parse_port_table_for_ship(html, ship_name, port_url, tab, label or port_url)
-                if not rows:
-                    parsed = urlparse(url)
-                    mobile_url = urlunparse(parsed._replace(netloc="www.vesselfinder.com"))
-                    html_m = _rendered_html(mobile_url, pool, mobile=True, wait_selector="table")
-                    rows = _parse_port_table_for_ship(html_m, ship_name, port_url, tab, label or port_url)
-
-                for r in rows:
-                    key = (r["event"], r["port"], r["_iso"])
-                    if key in seen:
-                        continue
-                    out.append(r); seen.add(key)
-            except Exception as e:
-                print(f"[warn] Port fallback {label or port_url} ({tab}) failed: {e}", file=sys.stderr)
+    for rows in results:
+        for r in rows:
+            key = (r["event"], r["port"], r["_iso"])
+            if key in seen:
+                continue
+            out.append(r); seen.add(key)
     return out
 
 # ---------- Helpers for fallback gating ----------
 
-def _most_recent_event_iso(items):
+def _most_recent_event_iso(isos):
     try:
-        return max((
-            datetime.fromisoformat(i.get("eventUtc"))
-            for i in items if i.get("eventUtc")
-        ), default=None)
+        return max((datetime.fromisoformat(iso) for iso in isos if iso), default=None)
     except Exception:
         return None
 
 # ---------- Main ----------
 
-def main():
-    os.makedirs(DOCS_DIR, exist_ok=True)
-
-    ships = load_json(SHIPS_PATH, [])
-    if not ships:
-        print(f"[error] ships.json not found or empty at {SHIPS_PATH}", file=sys.stderr)
-        return  # nothing to do
-
-    # name -> slug lookup (for latest-all fallback)
-    slug_by_name = {s["name"]: s["slug"] for s in ships}
+async def _process_ship(pool: BrowserPool, s: dict, state: dict, canon_seen: dict, all_items_new: list,
+                        cm_coords: dict):
+    name = s.get("name"); slug = s.get("slug"); vf_url = s.get("url")
+    if not (name and slug and vf_url):
+        print(f"[warn] skipping malformed ship entry: {s}", file=sys.stderr)
+        return
 
-    state = load_json(STATE_PATH, {"seen": {}, "geo": {}, "canon_seen": {}})
-    if "seen" not in state: state["seen"] = {}
-    if "geo" not in state: state["geo"] = {}
-    canon_seen = state.setdefault("canon_seen", {})
+    print(f"[info] Fetching VF for {name}: {vf_url}")
 
-    all_items_new = []
+    # 1) VesselFinder port-calls (ship page)
+    try:
+        rows, used = await _vf_events_for_ship(pool, s)
+        print(f"[info] Parsed VF {name}: {len(rows)} events")
+    except Exception as e:
+        print(f"[error] VF parse failed for {name}: {e}\n{traceback.format_exc()}", file=sys.stderr)
+        rows = []
+        used = vf_url
 
-    _ensure_stylesheet_dcl()
+    ship_items_new = []
 
-    with sync_playwright() as p:
-        pool = BrowserPool(p)
+    # 1a) Build items from ship page rows
+    for r in rows:
         try:
-            for s in ships:
-                name = s.get("name"); slug = s.get("slug"); vf_url = s.get("url")
-                if not (name and slug and vf_url):
-                    print(f"[warn] skipping malformed ship entry: {s}", file=sys.stderr)
-                    continue
+            est_str, local_str, event_iso = format_times_for_notification(
+                r.get("port",""), r.get("link",""), r.get("when_raw","")
+            )
+            verb = "Arrived" if r.get("event") == "Arrived" else "Departed"
+
+            if (not event_iso) and SKIP_TBA.get(verb, False):
+                continue
+            # Without a parsed time there's nothing to key on; skip before building strings
+            if not event_iso:
+                continue
+
+            guid = _canonical_guid(slug, verb, r['port'], event_iso)
+            if guid in canon_seen:
+                continue
+
+            title_verb = "Arrived at" if verb == "Arrived" else "Departed from"
+            if est_str and local_str:
+                title = f"{name} {title_verb} {r['port']} at {est_str}. The local time to the port is {local_str}"
+            elif est_str:
+                title = f"{name} {title_verb} {r['port']} at {est_str}"
+            else:
+                continue
 
-                print(f"[info] Fetching VF for {name}: {vf_url}")
+            base_desc = r.get("detail","").replace(" (UTC) -", " (UTC) (time not yet posted)")
+            if est_str and local_str:
+                desc = f"{base_desc} — ET: {est_str} | Local: {local_str}"
+            elif est_str:
+                desc = f"{base_desc} — ET: {est_str}"
+            else:
+                desc = base_desc
 
-                # 1) VesselFinder port-calls (ship page)
-                try:
-                    rows, used = _vf_events_for_ship(pool, s)
-                    print(f"[info] Parsed VF {name}: {len(rows)} events")
-                except Exception as e:
-                    print(f"[error] VF parse failed for {name}: {e}\n{traceback.format_exc()}", file=sys.stderr)
-                    rows = []
-                    used = vf_url
+            link = urljoin(vf_url, r.get("link","")) if r.get("link") else vf_url
 
-                ship_items_new = []
+            item = {
+                "title": title,
+                "description": desc,
+                "link": link,
+                "guid": guid,
+                "pubDate": RUN_PUB,
+                "eventUtc": event_iso,
+                "eventEpoch": _event_epoch(event_iso),
+                "shipSlug": slug,
+                "shipName": name,
+                "source": "vf_ship"
+            }
+            ship_items_new.append(item)
+            all_items_new.append(item)
+            canon_seen[guid] = True
+
+            # ---- email notify (JSON attachment)
+            await asyncio.to_thread(post_flow_webhook, {
+                "ShipName":   name,
+                "EventType":  verb,                 # Arrived | Departed
+                "PortName":   r["port"],
+                "ESTLabel":   est_str or "",
+                "LocalLabel": local_str or "",
+                "Link":       link or "",
+                "Title":      title,
+                "GuidKey":    guid,
+                "PubDate":    item["pubDate"],
+                "Description": desc
+            })
 
-                # 1a) Build items from ship page rows
-                for r in rows:
-                    try:
-                        est_str, local_str, event_iso = format_times_for_notification(
-                            r.get("port",""), r.get("link",""), r.get("when_raw","")
-                        )
-                        verb = "Arrived" if r.get("event") == "Arrived" else "Departed"
-                        title_verb = "Arrived at" if verb == "Arrived" else "Departed from"
+        except Exception as e:
+            print(f"[warn] VF item build failed for {name}: {e}", file=sys.stderr)
 
-                        if (not event_iso) and SKIP_TBA.get(verb, False):
-                            continue
+    # Decide whether to skip port fallback (recent event within X hours)
+    recent_iso = _most_recent_event_iso(it.get("eventUtc") for it in ship_items_new)
+    now_utc = RUN_NOW
+    skip_fallback = (not FORCE_PORT_FALLBACK) and bool(
+        recent_iso and (now_utc - recent_iso) < timedelta(hours=PORT_FALLBACK_STALE_HOURS))
+    if skip_fallback:
+        print(f"[info] Port fallback skipped for {name}: ship page has a new event from {recent_iso.isoformat()}")
 
-                        if est_str and local_str:
-                            title = f"{name} {title_verb} {r['port']} at {est_str}. The local time to the port is {local_str}"
-                        elif est_str:
-                            title = f"{name} {title_verb} {r['port']} at {est_str}"
-                        else:
+    # 2) Port-page fallback (limit candidates)
+    if not skip_fallback:
+        try:
+            # url -> label; first label seen for a url wins
+            candidates = {}
+            if rows and rows[0].get("link"):
+                candidates[rows[0]["link"]] = rows[0].get("port","")
+
+            for hp in s.get("home_ports", []):
+                if isinstance(hp, str):
+                    if hp:
+                        candidates.setdefault(hp, "")
+                elif isinstance(hp, dict):
+                    link = hp.get("link","")
+                    if link:
+                        candidates.setdefault(link, hp.get("label",""))
+
+            candidate_links = list(candidates.items())
+
+            if not candidate_links:
+                dflt = DEFAULT_PORTS_BY_SHIP.get(name, [])
+                if dflt:
+                    candidate_links = [(d["link"], d.get("label","")) for d in dflt if d.get("link")]
+                else:
+                    candidate_links = [(d["link"], d.get("label","")) for d in GLOBAL_FALLBACK_PORTS]
+
+            # keep it snappy
+            candidate_links = candidate_links[:3]
+
+            if candidate_links:
+                port_rows = await _fetch_port_fallback_events(pool, name, candidate_links)
+                print(f"[info] Port fallback {name} using {len(candidate_links)} port(s): {len(port_rows)} rows")
+
+                for r in port_rows:
+                    try:
+                        verb = r["event"]
+                        est_str, local_str, event_iso = r.get("_est"), r.get("_local"), r.get("_iso")
+                        guid = _canonical_guid(slug, verb, r['port'], event_iso)
+                        if guid in canon_seen:
                             continue
 
-                        base_desc = r.get("detail","").replace(" (UTC) -", " (UTC) (time not yet posted)")
-                        if est_str and local_str:
-                            desc = f"{base_desc} — ET: {est_str} | Local: {local_str}"
-                        elif est_str:
-                            desc = f"{base_desc} — ET: {est_str}"
-                        else:
-                            desc = base_desc
+                        title_verb = "Arrived at" if verb == "Arrived" else "Departed from"
+                        title = f"{name} {title_verb} {r['port']} at {est_str}. The local time to the port is {local_str}"
 
-                        link = urljoin(vf_url, r.get("link","")) if r.get("link") else vf_url
+                        base_desc = r.get("detail","")
+                        desc = f"{base_desc} — ET: {est_str} | Local: {local_str}"
 
-                        event_iso_final = event_iso
-                        if not event_iso_final:
-                            continue
-
-                        guid = _canonical_guid(slug, verb, r['port'], event_iso_final)
-                        if canon_seen.get(guid):
-                            continue
+                        link = urljoin("https://www.vesselfinder.com", r.get("link",""))
 
                         item = {
                             "title": title,
                             "description": desc,
                             "link": link,
                             "guid": guid,
-                            "pubDate": to_rfc2822(datetime.utcnow()),
-                            "eventUtc": event_iso_final,
+                            "pubDate": RUN_PUB,
+                            "eventUtc": event_iso,
+                            "eventEpoch": _event_epoch(event_iso),
                             "shipSlug": slug,
                             "shipName": name,
-                            "source": "vf_ship"
+                            "source": "vf_port"
                         }
                         ship_items_new.append(item)
                         all_items_new.append(item)
                         canon_seen[guid] = True
 
                         # ---- email notify (JSON attachment)
-                        post_flow_webhook({
+                        await asyncio.to_thread(post_flow_webhook, {
                             "ShipName":   name,
-                            "EventType":  verb,                 # Arrived | Departed
+                            "EventType":  verb,
                             "PortName":   r["port"],
                             "ESTLabel":   est_str or "",
                             "LocalLabel": local_str or "",
@@ -1118,182 +1470,147 @@ def main():
                         })
 
                     except Exception as e:
-                        print(f"[warn] VF item build failed for {name}: {e}", file=sys.stderr)
+                        print(f"[warn] Port-fallback build failed for {name}: {e}", file=sys.stderr)
+        except Exception as e:
+            print(f"[warn] Port fallback failed for {name}: {e}", file=sys.stderr)
 
-                # Decide whether to skip port fallback (recent event within X hours)
-                recent_iso = _most_recent_event_iso(ship_items_new)
-                now_utc = datetime.utcnow().replace(tzinfo=timezone.utc)
-                skip_fallback = bool(recent_iso and (now_utc - recent_iso) < timedelta(hours=18))
+    # 3) Geofence (CruiseMapper coords via HTTP)
+    cm_url = _cm_url(s)
+    try:
+        task = cm_coords.get(cm_url)
+        coords = await (task if task is not None else asyncio.to_thread(_cm_fetch_coords_http, cm_url))
+        if coords:
+            geo_items = geofence_events_from_coords(name, slug, coords, state)
+            for it in geo_items:
+                if it["guid"] in canon_seen:
+                    continue
+                ship_items_new.append(it)
+                all_items_new.append(it)
+                canon_seen[it["guid"]] = True
+
+                # ---- email notify (JSON attachment)
+                await asyncio.to_thread(post_flow_webhook, {
+                    "ShipName":   it["shipName"],
+                    "EventType":  it.get("eventType",""),
+                    "PortName":   it.get("portName",""),
+                    "ESTLabel":   it.get("estLabel",""),
+                    "LocalLabel": it.get("localLabel",""),
+                    "Link":       it.get("link",""),
+                    "Title":      it.get("title",""),
+                    "GuidKey":    it.get("guid",""),
+                    "PubDate":    it.get("pubDate",""),
+                    "Description": it.get("description","")
+                })
+
+        else:
+            print(f"[warn] No coords from CruiseMapper for {name} ({cm_url})")
+    except Exception as e:
+        print(f"[warn] Geofence failed for {name}: {e}", file=sys.stderr)
+
+    # ---- PER SHIP HISTORY (sorted by event time) ----
+    # Saved files are already merged/capped; with nothing new only the feeds' signature check runs
+    ship_hist = load_history(slug)
+    if ship_items_new:
+        ship_hist = merge_items(ship_hist, ship_items_new, PER_SHIP_CAP)
+        save_history(slug, ship_hist)
+
+    # DEBUG metrics
+    print(f"[debug] {name} new_items: ship_page={len([i for i in ship_items_new if i.get('source')=='vf_ship'])} "
+          f"port_fallback={len([i for i in ship_items_new if i.get('source')=='vf_port'])} "
+          f"geo={len([i for i in ship_items_new if i.get('source')=='geo'])} "
+          f"total_added_this_run={len(ship_items_new)} "
+          f"hist_after_merge={len(ship_hist)}")
+
+    # Write per-ship feeds (indented + XSL PI)
+    try:
+        _write_feed((os.path.join(DOCS_DIR, f"{slug}.xml"),),
+                    f"{name} - Arrivals & Departures", vf_url, ship_hist)
+        _write_feed((os.path.join(DOCS_DIR, f"{slug}-latest.xml"),),
+                    f"{name} - Latest Arrival/Departure", vf_url, ship_hist[:1])
+    except Exception as e:
+        print(f"[error] Writing ship feeds failed for {name}: {e}", file=sys.stderr)
 
-                # 2) Port-page fallback (limit candidates)
-                if not skip_fallback:
-                    try:
-                        candidate_links = []
-                        if rows and rows[0].get("link"):
-                            candidate_links.append((rows[0]["link"], rows[0].get("port","")))
-
-                        for hp in s.get("home_ports", []):
-                            if isinstance(hp, str):
-                                candidate_links.append((hp, ""))
-                            elif isinstance(hp, dict):
-                                link = hp.get("link","")
-                                label = hp.get("label","")
-                                if link:
-                                    candidate_links.append((link, label))
-
-                        dedup = {}
-                        for u,lbl in candidate_links:
-                            if u and u not in dedup:
-                                dedup[u] = lbl
-                        candidate_links = [(u, dedup[u]) for u in dedup.keys()]
-
-                        if not candidate_links:
-                            dflt = DEFAULT_PORTS_BY_SHIP.get(name, [])
-                            if dflt:
-                                candidate_links = [(d["link"], d.get("label","")) for d in dflt if d.get("link")]
-                            else:
-                                candidate_links = [(d["link"], d.get("label","")) for d in GLOBAL_FALLBACK_PORTS]
-
-                        # keep it snappy
-                        candidate_links = candidate_links[:3]
-
-                        if candidate_links:
-                            port_rows = _fetch_port_fallback_events(pool, name, candidate_links)
-                            print(f"[info] Port fallback {name} using {len(candidate_links)} port(s): {len(port_rows)} rows")
-
-                            for r in port_rows:
-                                try:
-                                    verb = r["event"]
-                                    est_str, local_str, event_iso = r.get("_est"), r.get("_local"), r.get("_iso")
-                                    title_verb = "Arrived at" if verb == "Arrived" else "Departed from"
-                                    title = f"{name} {title_verb} {r['port']} at {est_str}. The local time to the port is {local_str}"
-
-                                    base_desc = r.get("detail","")
-                                    desc = f"{base_desc} — ET: {est_str} | Local: {local_str}"
-
-                                    link = urljoin("https://www.vesselfinder.com", r.get("link",""))
-
-                                    guid = _canonical_guid(slug, verb, r['port'], event_iso)
-                                    if canon_seen.get(guid):
-                                        continue
-
-                                    item = {
-                                        "title": title,
-                                        "description": desc,
-                                        "link": link,
-                                        "guid": guid,
-                                        "pubDate": to_rfc2822(datetime.utcnow()),
-                                        "eventUtc": event_iso,
-                                        "shipSlug": slug,
-                                        "shipName": name,
-                                        "source": "vf_port"
-                                    }
-                                    ship_items_new.append(item)
-                                    all_items_new.append(item)
-                                    canon_seen[guid] = True
-
-                                    # ---- email notify (JSON attachment)
-                                    post_flow_webhook({
-                                        "ShipName":   name,
-                                        "EventType":  verb,
-                                        "PortName":   r["port"],
-                                        "ESTLabel":   est_str or "",
-                                        "LocalLabel": local_str or "",
-                                        "Link":       link or "",
-                                        "Title":      title,
-                                        "GuidKey":    guid,
-                                        "PubDate":    item["pubDate"],
-                                        "Description": desc
-                                    })
-
-                                except Exception as e:
-                                    print(f"[warn] Port-fallback build failed for {name}: {e}", file=sys.stderr)
-                    except Exception as e:
-                        print(f"[warn] Port fallback failed for {name}: {e}", file=sys.stderr)
-
-                # 3) Geofence (CruiseMapper coords via HTTP)
-                cm_url = s.get("cm_url") or f"https://www.cruisemapper.com/ships/{_cm_slug(name)}"
-                try:
-                    coords = _cm_fetch_coords_http(cm_url)
-                    if coords:
-                        geo_items = geofence_events_from_coords(name, slug, coords, state)
-                        for it in geo_items:
-                            if canon_seen.get(it["guid"]):
-                                continue
-                            ship_items_new.append(it)
-                            all_items_new.append(it)
-                            canon_seen[it["guid"]] = True
-
-                            # ---- email notify (JSON attachment)
-                            post_flow_webhook({
-                                "ShipName":   it["shipName"],
-                                "EventType":  it.get("eventType",""),
-                                "PortName":   it.get("portName",""),
-                                "ESTLabel":   it.get("estLabel",""),
-                                "LocalLabel": it.get("localLabel",""),
-                                "Link":       it.get("link",""),
-                                "Title":      it.get("title",""),
-                                "GuidKey":    it.get("guid",""),
-                                "PubDate":    it.get("pubDate",""),
-                                "Description": it.get("description","")
-                            })
-
-                    else:
-                        print(f"[warn] No coords from CruiseMapper for {name} ({cm_url})")
-                except Exception as e:
-                    print(f"[warn] Geofence failed for {name}: {e}", file=sys.stderr)
-
-                # ---- PER SHIP HISTORY (sorted by event time) ----
-                ship_hist = load_history(slug)
-                ship_hist = merge_items(ship_hist, ship_items_new, PER_SHIP_CAP)
-                save_history(slug, ship_hist)
-
-                # DEBUG metrics
-                print(f"[debug] {name} new_items: ship_page={len([i for i in ship_items_new if i.get('source')=='vf_ship'])} "
-                      f"port_fallback={len([i for i in ship_items_new if i.get('source')=='vf_port'])} "
-                      f"geo={len([i for i in ship_items_new if i.get('source')=='geo'])} "
-                      f"total_added_this_run={len(ship_items_new)} "
-                      f"hist_after_merge={len(ship_hist)}")
-
-                # Write per-ship feeds (pretty + XSL PI)
-                try:
-                    ship_xml = build_rss(f"{name} - Arrivals & Departures", vf_url, ship_hist)
-                    ship_xml = _pretty_xml(ship_xml)
-                    _write_if_changed(os.path.join(DOCS_DIR, f"{slug}.xml"), ship_xml)
-
-                    latest_xml = build_rss(f"{name} - Latest Arrival/Departure", vf_url, ship_hist[:1])
-                    latest_xml = _pretty_xml(latest_xml)
-                    _write_if_changed(os.path.join(DOCS_DIR, f"{slug}-latest.xml"), latest_xml)
-                except Exception as e:
-                    print(f"[error] Writing ship feeds failed for {name}: {e}", file=sys.stderr)
+async def _handle_ship(pool: BrowserPool, sem: asyncio.Semaphore, s: dict, state: dict, canon_seen: dict,
+                       all_items_new: list, cm_coords: dict):
+    async with sem:
+        await _process_ship(pool, s, state, canon_seen, all_items_new, cm_coords)
+
+async def _scrape_all(ships: list, state: dict, canon_seen: dict, all_items_new: list):
+    """
+    Scrape ships concurrently (bounded by SHIP_CONCURRENCY) on one shared browser.
+    Shared dicts/lists need no lock: each check-then-set on canon_seen runs without
+    an await in between, and geo state is keyed per ship.
+    """
+    sem = asyncio.Semaphore(SHIP_CONCURRENCY)
+    # CruiseMapper is plain HTTP and independent of VF; fetch every ship's coords up front
+    # (one request per distinct URL) so they overlap the browser work instead of trailing it.
+    cm_coords = {}
+    for s in ships:
+        if s.get("name"):
+            url = _cm_url(s)
+            if url not in cm_coords:
+                cm_coords[url] = asyncio.ensure_future(asyncio.to_thread(_cm_fetch_coords_http, url))
+    async with async_playwright() as p:
+        pool = await BrowserPool.launch(p)
+        try:
+            results = await asyncio.gather(
+                *(_handle_ship(pool, sem, s, state, canon_seen, all_items_new, cm_coords) for s in ships),
+                return_exceptions=True
+            )
         finally:
-            pool.close()
+            await pool.close()
+    for s, res in zip(ships, results):
+        if isinstance(res, BaseException):
+            print(f"[error] Ship task failed for {s.get('name')}: {res!r}", file=sys.stderr)
+
+def main():
+    _ensure_dir(DOCS_DIR)
+
+    ships = load_json(SHIPS_PATH, [])
+    if not ships:
+        print(f"[error] ships.json not found or empty at {SHIPS_PATH}", file=sys.stderr)
+        return  # nothing to do
+
+    # name -> slug lookup (for latest-all fallback)
+    slug_by_name = {s["name"]: s["slug"] for s in ships}
+
+    state = load_json(STATE_PATH, {"seen": {}, "geo": {}, "canon_seen": {}})
+    if "seen" not in state: state["seen"] = {}
+    if "geo" not in state: state["geo"] = {}
+    canon_seen = state.setdefault("canon_seen", {})
+    state.pop("feed_sigs", None)   # no longer used; feeds are compared against the files on disk
+
+    all_items_new = []
+
+    _ensure_stylesheet_dcl()
+
+    asyncio.run(_scrape_all(ships, state, canon_seen, all_items_new))
 
     # ---- COMBINED HISTORY (sorted by event time) ----
     all_hist = load_history("all")
-    all_hist = merge_items(all_hist, all_items_new, ALL_CAP)
-    save_history("all", all_hist)
+    if all_items_new:
+        all_hist = merge_items(all_hist, all_items_new, ALL_CAP)
+        save_history("all", all_hist)
 
     try:
-        all_xml = build_rss("DCL Ships - Arrivals & Departures (All)", "https://github.com/", all_hist)
-        all_xml = _pretty_xml(all_xml)
-        _write_if_changed(os.path.join(DOCS_DIR, "all.xml"), all_xml)
+        _write_feed((os.path.join(DOCS_DIR, "all.xml"),),
+                    "DCL Ships - Arrivals & Departures (All)", "https://github.com/", all_hist)
     except Exception as e:
         print(f"[error] Writing all.xml failed: {e}", file=sys.stderr)
 
     # ---- Latest one per ship (newest real event) ----
+    # Longest names first so a prefix name can never shadow a longer one
+    names_longest_first = sorted(slug_by_name.items(), key=lambda kv: -len(kv[0]))
+
     def _infer_slug_from_title(title: str) -> str:
-        for nm, sl in slug_by_name.items():
+        for nm, sl in names_longest_first:
             if title.startswith(nm):
                 return sl
         cut = title.find(" Arrived")
         if cut == -1:
             cut = title.find(" Departed")
-        base = title[:cut] if cut != -1 else title
-        for nm, sl in slug_by_name.items():
-            if base.strip() == nm:
-                return sl
-        return base.strip()
+        base = (title[:cut] if cut != -1 else title).strip()
+        return slug_by_name.get(base, base)
 
     all_hist_sorted = sorted(all_hist, key=_event_key, reverse=True)
 
@@ -1310,14 +1627,15 @@ def main():
     latest_all = sorted(list(latest_by_slug.values()), key=_event_key, reverse=True)
 
     try:
-        latest_all_xml = build_rss("DCL Ships - Latest (One per Ship)", "https://github.com/", latest_all)
-        latest_all_xml = _pretty_xml(latest_all_xml)
-        _write_if_changed(os.path.join(DOCS_DIR, "latest-all.xml"), latest_all_xml)
-        _write_if_changed(os.path.join(DOCS_DIR, "latest.xml"), latest_all_xml)
+        _write_feed((os.path.join(DOCS_DIR, "latest-all.xml"), os.path.join(DOCS_DIR, "latest.xml")),
+                    "DCL Ships - Latest (One per Ship)", "https://github.com/", latest_all)
     except Exception as e:
         print(f"[error] Writing latest-all.xml failed: {e}", file=sys.stderr)
 
-    save_json(STATE_PATH, state)
+    # Dicts keep insertion order, so the first keys are the oldest guids
+    if len(canon_seen) > SEEN_CAP:
+        state["canon_seen"] = dict(islice(canon_seen.items(), len(canon_seen) - SEEN_CAP, None))
+    save_json(STATE_PATH, state, compact=True)
 
 if __name__ == "__main__":
     try:
@@ -1,11 +1,25 @@
 #!/usr/bin/env python3
 # DCL Ship Alerts — scraper + RSS generator (GitHub Pages compatible)
 # Requires: requests, beautifulsoup4
-import os, re, json, hashlib, sys, traceback
+# Optional: lxml (faster HTML parsing), orjson (faster state.json load/save)
+import os, re, json, hashlib, sys, traceback, threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from urllib.parse import urljoin
+from functools import lru_cache
+from urllib.parse import urljoin, urlparse
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup, NavigableString, Tag
+try:
+    import lxml  # noqa: F401  (optional: faster BeautifulSoup tree builder)
+    _HTML_PARSER = "lxml"
+except ImportError:
+    _HTML_PARSER = "html.parser"
+try:
+    import orjson   # optional: C-backed JSON, same bytes as json.dump(indent=2, ensure_ascii=False)
+except ImportError:
+    orjson = None
 
 REPO_ROOT = os.path.dirname(__file__)
 DOCS_DIR = os.path.join(REPO_ROOT, "docs")
@@ -15,14 +29,32 @@ SHIPS_PATH = os.path.join(REPO_ROOT, "ships.json")
 USER_AGENT = "Mozilla/5.0 (compatible; DCL-Ship-Alerts/1.0)"
 SESSION = requests.Session()
 SESSION.headers.update({"User-Agent": USER_AGENT, "Accept": "text/html,application/xhtml+xml"})
+FETCH_WORKERS = 8   # ship pages fetched in parallel (network-bound)
+PER_HOST_LIMIT = 4  # concurrent requests to any one host (most ships share vesselfinder.com)
+MAX_PAGE_BYTES = 2_000_000   # ship pages are a few hundred KB; anything past this is not parsed
+# Keep-alive pool sized for the fetch workers; transient errors/rate limits retried with backoff
+_ADAPTER = HTTPAdapter(
+    pool_connections=FETCH_WORKERS, pool_maxsize=FETCH_WORKERS,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=frozenset({"GET"})),
+)
+SESSION.mount("https://", _ADAPTER)
+SESSION.mount("http://", _ADAPTER)
 
 def load_json(path, default):
     if os.path.exists(path):
+        if orjson:
+            with open(path, "rb") as f:
+                return orjson.loads(f.read())
         with open(path, "r", encoding="utf-8") as f:
             return json.load(f)
     return default
 
 def save_json(path, data):
+    if orjson:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        return
     with open(path, "w", encoding="utf-8") as f:
         json.dump(data, f, indent=2, ensure_ascii=False)
 
@@ -63,32 +95,60 @@ def build_rss(channel_title: str, channel_link: str, items: list) -> str:
 </rss>
 """
 
+_LAST_BUILD_RE = re.compile(r"<lastBuildDate>.*?</lastBuildDate>")
+
+def write_feed(path: str, xml: str) -> bool:
+    """Write an RSS file unless the only difference from what's on disk is lastBuildDate."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            old = f.read()
+        if _LAST_BUILD_RE.sub("", old, 1) == _LAST_BUILD_RE.sub("", xml, 1):
+            return False
+    except FileNotFoundError:
+        pass
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(xml)
+    return True
+
 # ------------------ NEW: robust parser for "Recent Port Calls" ------------------
 
-def _is_header(tag: Tag) -> bool:
-    if not isinstance(tag, Tag): return False
-    if tag.name in ("h1","h2","h3","h4","h5"):
-        return True
-    # some pages use divs styled like headers
-    txt = (tag.get_text(strip=True) or "").lower()
-    return tag.name == "div" and any(k in txt for k in ("recent port calls", "port calls", "arrivals", "departures"))
+# Label matchers for string= searches: matched in C, no per-node .lower() copy
+_ARR_RE = re.compile(r"arrival \(utc\)", re.IGNORECASE)
+_DEP_RE = re.compile(r"departure \(utc\)", re.IGNORECASE)
+
+# Header candidates (some pages use divs styled like headers)
+_HEADER_NAMES = frozenset({"h1", "h2", "h3", "h4", "h5", "div"})
+
+def _phrase_headers(soup: BeautifulSoup):
+    """
+    Header tags whose text contains "recent port calls", in document order. A tag's text
+    contains every descendant's text, so one walk from the root can skip any subtree
+    without the phrase instead of running get_text() on each nested div.
+    """
+    stack = [soup]
+    while stack:
+        node = stack.pop()
+        if "recent port calls" not in (node.get_text(strip=True) or "").lower():
+            continue
+        if node.name in _HEADER_NAMES:
+            yield node
+        stack.extend(reversed([c for c in node.children if isinstance(c, Tag)]))
 
 def _find_recent_port_calls_root(soup: BeautifulSoup) -> Tag | None:
     # 1) exact phrase
-    for tag in soup.find_all(lambda t: isinstance(t, Tag) and _is_header(t)):
-        if "recent port calls" in (tag.get_text(strip=True) or "").lower():
-            # usually the container with cards is right after this header
-            nxt = tag.find_next_sibling()
-            # if whitespace/text nodes in between, walk forward a bit
-            steps = 0
-            while nxt and steps < 5 and (isinstance(nxt, NavigableString) or (isinstance(nxt, Tag) and nxt.get_text(strip=True) == "")):
-                nxt = nxt.next_sibling
-                steps += 1
-            if isinstance(nxt, Tag):
-                return nxt
+    for tag in _phrase_headers(soup):
+        # usually the container with cards is right after this header
+        nxt = tag.find_next_sibling()
+        # if whitespace/text nodes in between, walk forward a bit
+        steps = 0
+        while nxt and steps < 5 and (isinstance(nxt, NavigableString) or (isinstance(nxt, Tag) and nxt.get_text(strip=True) == "")):
+            nxt = nxt.next_sibling
+            steps += 1
+        if isinstance(nxt, Tag):
+            return nxt
 
     # 2) fallback: search for any element that contains "Arrival (UTC)" which appears in each card
-    cand = soup.find(string=lambda s: isinstance(s, str) and "arrival (utc)" in s.lower())
+    cand = soup.find(string=_ARR_RE)
     if cand:
         # climb up until we reach a container that has multiple siblings like cards
         node = cand
@@ -96,13 +156,15 @@ def _find_recent_port_calls_root(soup: BeautifulSoup) -> Tag | None:
             node = node.parent
             if not isinstance(node, Tag): break
             # heuristic: a container whose direct children contain multiple "Arrival (UTC)" labels
-            siblings = node.find_all(string=lambda s: isinstance(s, str) and "arrival (utc)" in s.lower())
+            # Only "at least two" matters, so stop the subtree scan at the second hit
+            siblings = node.find_all(string=_ARR_RE, limit=2)
             if len(siblings) >= 2:
                 return node
     return None
 
-def parse_port_calls(html: str):
-    soup = BeautifulSoup(html, "html.parser")
+def parse_port_calls(page: bytes, encoding: str | None = None):
+    # `encoding` is the HTTP header charset, if any; otherwise BOM/<meta> sniffing decides
+    soup = BeautifulSoup(page, _HTML_PARSER, from_encoding=encoding)
     root = _find_recent_port_calls_root(soup)
     rows = []
 
@@ -117,21 +179,20 @@ def parse_port_calls(html: str):
     for block in root.find_all(recursive=False):
         if not isinstance(block, Tag): 
             continue
-        # be tolerant: some sites nest a block extra deep
-        blk_txt = (block.get_text(" ", strip=True) or "").lower()
-        if "arrival (utc)" not in blk_txt and "departure (utc)" not in blk_txt:
-            # try one level deeper
-            inner = block.find(string=lambda s: isinstance(s, str) and ("arrival (utc)" in s.lower() or "departure (utc)" in s.lower()))
-            if not inner:
-                continue
+        # be tolerant: some sites nest a block extra deep. One walk over the block's
+        # strings serves both label lookups; a block with neither label yields no rows.
+        strs = block.find_all(string=True)
+        arr_lab = next((s for s in strs if _ARR_RE.search(s)), None)
+        dep_lab = next((s for s in strs if _DEP_RE.search(s)), None)
+        if arr_lab is None and dep_lab is None:
+            continue
 
         # port name + link
         a = block.find("a")
         port_name = a.get_text(strip=True) if a else "Unknown Port"
         port_link = a["href"] if (a and a.has_attr("href")) else ""
 
-        def value_after(label_substr: str) -> str:
-            lab = block.find(string=lambda s: isinstance(s, str) and label_substr in s.lower())
+        def value_after(lab) -> str:
             if not lab: 
                 return ""
             # typical layout: label is inside a small <div>, value is the next <div> sibling
@@ -150,8 +211,8 @@ def parse_port_calls(html: str):
                 pass
             return ""
 
-        arr = value_after("arrival (utc)")
-        dep = value_after("departure (utc)")
+        arr = value_after(arr_lab)
+        dep = value_after(dep_lab)
 
         # Build items (use whichever exists)
         if arr:
@@ -175,40 +236,89 @@ def parse_port_calls(html: str):
 
 # ------------------ main runner ------------------
 
+_HOST_SLOTS = {}
+_HOST_SLOTS_LOCK = threading.Lock()
+
+def _host_slot(url: str) -> threading.BoundedSemaphore:
+    host = urlparse(url).netloc
+    with _HOST_SLOTS_LOCK:
+        sem = _HOST_SLOTS.get(host)
+        if sem is None:
+            sem = _HOST_SLOTS[host] = threading.BoundedSemaphore(PER_HOST_LIMIT)
+    return sem
+
+@lru_cache(maxsize=4096)
+def _abs_link(base: str, href: str) -> str:
+    # Absolute hrefs come back from urljoin unchanged; skip the parse for those
+    if href.startswith(("http://", "https://")):
+        return href
+    return urljoin(base, href)
+
+def fetch_page(ship):
+    """GET one ship page; returns (raw bytes, header charset or None, None) or (None, None, error)."""
+    print(f"[info] Fetching {ship['name']}: {ship['url']}")
+    try:
+        with _host_slot(ship["url"]), SESSION.get(ship["url"], timeout=45, stream=True) as resp:
+            resp.raise_for_status()
+            # requests defaults text/* to ISO-8859-1 when no charset is sent; only pass a real one on
+            charset = resp.encoding if "charset" in resp.headers.get("Content-Type", "").lower() else None
+            # Raw bytes (decoded once, by the parser), read up to MAX_PAGE_BYTES
+            buf = bytearray()
+            for chunk in resp.iter_content(65536):
+                buf += chunk
+                if len(buf) >= MAX_PAGE_BYTES:
+                    del buf[MAX_PAGE_BYTES:]
+                    print(f"[warn] {ship['name']}: page truncated at {MAX_PAGE_BYTES} bytes", file=sys.stderr)
+                    break
+        return bytes(buf), charset, None
+    except Exception as e:
+        return None, None, e
+
+def fetch_and_parse(ship):
+    """Fetch + parse one ship page in a worker; returns (rows, None) or (None, fetch error)."""
+    page, charset, err = fetch_page(ship)
+    if err is not None:
+        return None, err
+    name = ship["name"]
+    try:
+        rows = parse_port_calls(page, charset)
+        print(f"[info] Parsed {name}: found {len(rows)} events")
+    except Exception as e:
+        print(f"[error] parse failed for {name}: {e}\n{traceback.format_exc()}", file=sys.stderr)
+        rows = []
+    return rows, None
+
 def main():
     os.makedirs(DOCS_DIR, exist_ok=True)
     ships = load_json(SHIPS_PATH, [])
     state = load_json(STATE_PATH, {"seen": {}})
+    # Stays an insertion-ordered dict (not a set) so state.json keeps a stable key order between runs
+    seen = state.setdefault("seen", {})
     all_items = []
 
-    for s in ships:
+    # Fetch + parse every page concurrently (one ship's parse overlaps the others'
+    # downloads); results come back in ship order, so the processing below (and
+    # all.xml ordering) is the same as a serial run.
+    with ThreadPoolExecutor(max_workers=max(1, min(FETCH_WORKERS, len(ships)))) as pool:
+        results = list(pool.map(fetch_and_parse, ships))
+
+    for s, (rows, err) in zip(ships, results):
         name = s["name"]; slug = s["slug"]; url = s["url"]
-        print(f"[info] Fetching {name}: {url}")
-        try:
-            resp = SESSION.get(url, timeout=45)
-            resp.raise_for_status()
-        except Exception as e:
-            print(f"[warn] fetch failed for {name}: {e}", file=sys.stderr)
+        if err is not None:
+            print(f"[warn] fetch failed for {name}: {err}", file=sys.stderr)
             continue
 
-        try:
-            rows = parse_port_calls(resp.text)
-            print(f"[info] Parsed {name}: found {len(rows)} events")
-        except Exception as e:
-            print(f"[error] parse failed for {name}: {e}\n{traceback.format_exc()}", file=sys.stderr)
-            rows = []
-
         ship_items = []
         for r in rows:
             guid_src = f"{slug}|{r['event']}|{r['detail']}"
             guid = make_id(guid_src)
-            if state["seen"].get(guid):
+            if guid in seen:
                 continue
             # We don't have a machine timestamp from the page reliably; use now.
             pub_dt = datetime.utcnow()
             title = f"{name} — {r['event']} — {r['port'] or 'Unknown Port'}"
             desc  = r["detail"]
-            link  = urljoin(url, r["link"]) if r["link"] else url
+            link  = _abs_link(url, r["link"]) if r["link"] else url
             item = {
                 "title": title,
                 "description": desc,
@@ -218,18 +328,22 @@ def main():
             }
             ship_items.append(item)
             all_items.append(item)
-            state["seen"][guid] = True
-
-        # write per-ship feed (cap to last 50 new items per run)
-        feed_xml = build_rss(f"{name} - Arrivals & Departures", url, ship_items[:50])
-        with open(os.path.join(DOCS_DIR, f"{slug}.xml"), "w", encoding="utf-8") as f:
-            f.write(feed_xml)
-
-    # write combined feed (up to 100 items)
-    all_items_sorted = all_items[::-1]
-    all_xml = build_rss("DCL Ships - Arrivals & Departures (All)", "https://github.com/", all_items_sorted[:100])
-    with open(os.path.join(DOCS_DIR, "all.xml"), "w", encoding="utf-8") as f:
-        f.write(all_xml)
+            seen[guid] = True
+
+        # write per-ship feed (cap to last 50 new items per run); with nothing new,
+        # leave the existing feed (and its items) in place
+        feed_path = os.path.join(DOCS_DIR, f"{slug}.xml")
+        if ship_items or not os.path.exists(feed_path):
+            feed_xml = build_rss(f"{name} - Arrivals & Departures", url, ship_items[:50])
+            write_feed(feed_path, feed_xml)
+
+    # write combined feed (up to 100 items); like the per-ship feeds, a run with
+    # nothing new leaves the existing file in place
+    all_path = os.path.join(DOCS_DIR, "all.xml")
+    if all_items or not os.path.exists(all_path):
+        all_items_sorted = all_items[::-1]
+        all_xml = build_rss("DCL Ships - Arrivals & Departures (All)", "https://github.com/", all_items_sorted[:100])
+        write_feed(all_path, all_xml)
 
     save_json(STATE_PATH, state)
 